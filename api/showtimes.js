@@ -1,5 +1,6 @@
 // api/showtimes.js
 // ElevenLabs Client Tool endpoint
+import { createHash } from 'crypto';
 import { createRedisClient } from './utils/redis-client.js';
 import { getEasternTimeDate, getEasternTimeISO, formatDateYYYYMMDD, parseTime12Hour } from './utils/timezone.js';
 
@@ -23,7 +24,7 @@ export default async function handler(req, res) {
       movie_title, 
       day_type,  // 'weekend', 'today', 'tomorrow'
       time_preference // 'evening', 'afternoon', 'night'
-    } = req.method === 'GET' ? req.query : req.body;
+    } = req.method === 'GET' || req.method === 'HEAD' ? req.query : (req.body || {});
 
     // Fetch cached data (with development fallback)
     let cachedData, lastUpdated;
@@ -92,6 +93,20 @@ export default async function handler(req, res) {
       time_preference
     });
 
+    // Weak ETag over the results and the data's last_updated stamp, so unchanged
+    // results can be revalidated without resending the body. Only
+    // current_time_miami, the server clock, is left out of the hash
+    const etag = computeETag(formatted, conversationalSummary, lastUpdated);
+    res.setHeader('ETag', etag);
+
+    if (matchesETag(req.headers['if-none-match'], etag)) {
+      return res.status(304).end();
+    }
+
+    if (req.method === 'HEAD') {
+      return res.status(200).end();
+    }
+
     return res.status(200).json({
       success: true,
       data: formatted,
@@ -114,6 +129,23 @@ export default async function handler(req, res) {
 }
 
 // Helper functions
+function computeETag(formatted, conversationalSummary, lastUpdated) {
+  const hash = createHash('sha1')
+    .update(JSON.stringify({ formatted, conversationalSummary, lastUpdated }))
+    .digest('hex');
+  return `W/"${hash}"`;
+}
+
+function matchesETag(ifNoneMatch, etag) {
+  if (!ifNoneMatch) {
+    return false;
+  }
+  return ifNoneMatch.split(',').some(tag => {
+    const candidate = tag.trim();
+    return candidate === '*' || candidate === etag || `W/${candidate}` === etag;
+  });
+}
+
 function getWeekendShowtimes(showtimes) {
   const weekend = showtimes.weekend;
   return [
@@ -10,6 +10,9 @@ require('dotenv').config();
 // Note: Install with: npm install elevenlabs dotenv
 const { ElevenLabsApi } = require('elevenlabs');
 
+// Audio formats the agent can stream back to callers
+const OUTPUT_AUDIO_FORMATS = ['pcm_8000', 'pcm_16000', 'pcm_22050', 'pcm_24000', 'pcm_44100', 'pcm_48000', 'ulaw_8000'];
+
 async function loadConfig() {
   const apiKey = process.env.ELEVENLABS_API_KEY;
   if (!apiKey) {
@@ -22,9 +25,24 @@ async function loadConfig() {
     console.warn('Warning: Using placeholder URL. Set VERCEL_APP_URL environment variable.');
   }
 
+  // Check TTS tuning before anything is created on ElevenLabs
+  const optimizeLatency = process.env.EL_OPTIMIZE_LATENCY || '3';
+  if (!/^[0-4]$/.test(optimizeLatency)) {
+    console.error(`Error: EL_OPTIMIZE_LATENCY must be an integer from 0 to 4, got '${optimizeLatency}'`);
+    process.exit(1);
+  }
+
+  const outputFormat = process.env.EL_OUTPUT_FORMAT || 'ulaw_8000';
+  if (!OUTPUT_AUDIO_FORMATS.includes(outputFormat)) {
+    console.error(`Error: EL_OUTPUT_FORMAT must be one of ${OUTPUT_AUDIO_FORMATS.join(', ')}, got '${outputFormat}'`);
+    process.exit(1);
+  }
+
   return {
     apiKey,
-    vercelUrl
+    vercelUrl,
+    optimizeLatency: parseInt(optimizeLatency, 10),
+    outputFormat
   };
 }
 
@@ -36,7 +54,7 @@ async function createWebhookTool(client, vercelUrl) {
       type: 'webhook',
       name: 'Miami-Theater-Showtimes',
       description: 'Get current movie showtimes for Miami theaters. Can search by date, movie title, day type (today/tomorrow/weekend), or time preference (afternoon/evening/night).',
-      response_timeout_secs: 10,
+      response_timeout_secs: 5,
       disable_interruptions: false,
       force_pre_tool_speech: false,
       api_schema: {
@@ -98,7 +116,7 @@ async function createWebhookTool(client, vercelUrl) {
   }
 }
 
-async function createAgent(client, toolId) {
+async function createAgent(client, toolId, config) {
   console.log('🤖 Creating conversational agent...');
 
   const systemPrompt = `You are a helpful Miami theater assistant specializing in movie showtimes.
@@ -139,6 +157,11 @@ Always be friendly, helpful, and provide clear information about Miami theater s
           tool_ids: toolId ? [toolId] : []
         },
         first_message: "Hi! I'm your Miami theater assistant. I can help you find movie showtimes at local theaters. What would you like to know about current movies and showtimes?"
+      },
+      // optimize_streaming_latency is ignored by current API versions; see setup_agent.py
+      tts: {
+        optimize_streaming_latency: config.optimizeLatency,
+        agent_output_audio_format: config.outputFormat
       }
     }
   };
@@ -187,7 +210,7 @@ async function main() {
   }
 
   // Create agent
-  const agentId = await createAgent(client, toolId);
+  const agentId = await createAgent(client, toolId, config);
   if (!agentId) {
     console.error('❌ Failed to create agent. Exiting.');
     process.exit(1);
@@ -5,11 +5,162 @@ Creates a conversational AI agent with webhook tool integration.
 """
 
 import os
-import json
 import sys
+from datetime import datetime, timezone
+from functools import lru_cache
+import httpx
+import jsonschema
+import orjson
 from elevenlabs import ElevenLabs
 from elevenlabs.types import ToolsRequestModel, WebhookRequestModel
 
+# Static webhook tool schema; the URL and headers are filled in per deployment
+API_SCHEMA_TEMPLATE = {
+    "url": "{vercel_url}/api/showtimes",
+    "method": "GET",
+    "query_params_schema": {
+        "properties": {
+            "date": {
+                "type": "string",
+                "format": "date",
+                "description": "Specific date in YYYY-MM-DD format (e.g., '2024-01-15')"
+            },
+            "movie_title": {
+                "type": "string",
+                "description": "Movie title to search for (partial matching supported, e.g., 'spider' for 'Spider-Man')"
+            },
+            "day_type": {
+                "type": "string",
+                "enum": ["today", "tomorrow", "weekend"],
+                "description": "Quick date filters: 'today' for current day, 'tomorrow' for next day, 'weekend' for Friday-Sunday"
+            },
+            "time_preference": {
+                "type": "string",
+                "enum": ["afternoon", "evening", "night"],
+                "description": "Filter by time of day: 'afternoon' (12-5 PM), 'evening' (5-9 PM), 'night' (9 PM+)"
+            }
+        }
+    }
+}
+
+# A query parameter as this script defines it; other parameter fields
+# ElevenLabs accepts (is_system_provided, is_omitted, ...) are left open
+_QUERY_PARAM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "type": {"enum": ["string", "integer", "number", "boolean"]},
+        "description": {"type": "string"},
+        "enum": {"type": "array", "minItems": 1},
+        "format": {"type": "string"}
+    }
+}
+
+# Constrains only the api_schema fields this script sets; everything else
+# the webhook API accepts passes through for ElevenLabs to check
+TOOL_META_SCHEMA = {
+    "type": "object",
+    "required": ["url"],
+    "properties": {
+        "url": {"type": "string", "pattern": "^https?://"},
+        "method": {"enum": ["GET", "POST", "PUT", "PATCH", "DELETE"]},
+        "query_params_schema": {
+            "type": "object",
+            "required": ["properties"],
+            "properties": {
+                "properties": {
+                    "type": "object",
+                    "additionalProperties": _QUERY_PARAM_SCHEMA
+                },
+                "required": {"type": "array", "items": {"type": "string"}}
+            }
+        },
+        "request_headers": {
+            "type": "object",
+            # Plain strings, or secret / dynamic-variable locator objects
+            "additionalProperties": {"type": ["string", "object"]}
+        }
+    }
+}
+
+# Audio formats the agent can stream back to callers
+OUTPUT_AUDIO_FORMATS = ["pcm_8000", "pcm_16000", "pcm_22050", "pcm_24000", "pcm_44100", "pcm_48000", "ulaw_8000"]
+
+# Shape of the agent creation payload built by create_agent. Known objects are
+# closed so a misspelled key fails here; other documented sections stay open
+AGENT_META_SCHEMA = {
+    "type": "object",
+    "required": ["name", "conversation_config"],
+    "properties": {
+        "name": {"type": "string", "minLength": 1},
+        "conversation_config": {
+            "type": "object",
+            "required": ["agent"],
+            "properties": {
+                "agent": {
+                    "type": "object",
+                    "required": ["prompt"],
+                    "properties": {
+                        "prompt": {
+                            "type": "object",
+                            "required": ["prompt"],
+                            "properties": {
+                                "prompt": {"type": "string", "minLength": 1},
+                                "tool_ids": {"type": "array", "items": {"type": "string"}},
+                                "llm": {"type": "string"},
+                                "temperature": {"type": "number"}
+                            },
+                            "additionalProperties": False
+                        },
+                        "first_message": {"type": "string"},
+                        "language": {"type": "string"}
+                    },
+                    "additionalProperties": False
+                },
+                "tts": {
+                    "type": "object",
+                    "properties": {
+                        "optimize_streaming_latency": {"type": "integer", "minimum": 0, "maximum": 4},
+                        "agent_output_audio_format": {"enum": OUTPUT_AUDIO_FORMATS},
+                        "voice_id": {"type": "string"},
+                        "model_id": {"type": "string"},
+                        "stability": {"type": "number"},
+                        "similarity_boost": {"type": "number"},
+                        "speed": {"type": "number"}
+                    },
+                    "additionalProperties": False
+                },
+                "asr": {"type": "object"},
+                "turn": {"type": "object"},
+                "conversation": {"type": "object"}
+            },
+            "additionalProperties": False
+        },
+        "platform_settings": {"type": "object"},
+        "tags": {"type": "array", "items": {"type": "string"}}
+    },
+    "additionalProperties": False
+}
+
+# Compiled once so malformed configs fail locally before any API round-trip
+_TOOL_VALIDATOR = jsonschema.Draft202012Validator(TOOL_META_SCHEMA)
+_AGENT_VALIDATOR = jsonschema.Draft202012Validator(AGENT_META_SCHEMA)
+
+# The SDK does not configure an httpx client passed to it, so mirror its
+# defaults (240 s timeout, redirects followed); limits match test_integration.py
+REQUEST_TIMEOUT = httpx.Timeout(240.0)
+CONNECTION_LIMITS = httpx.Limits(max_keepalive_connections=4)
+
+# Stands in for the real tool id while the agent payload is validated
+TOOL_ID_PLACEHOLDER = "pending-tool-id"
+
+PROMPT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prompts', 'agent_system.txt')
+
+@lru_cache(maxsize=None)
+def _load_prompt():
+    """Load the agent system prompt from disk, reading it only once."""
+    with open(PROMPT_FILE, 'r', encoding='utf-8') as f:
+        return f.read().strip()
+
 def load_config():
     """Load configuration from environment variables."""
     api_key = os.getenv('ELEVENLABS_API_KEY')
@@ -21,41 +172,44 @@ def load_config():
     if vercel_url == 'https://your-vercel-app.vercel.app':
         print("Warning: Using placeholder URL. Set VERCEL_APP_URL environment variable.")
 
+    # Check TTS tuning before anything is created on ElevenLabs
+    raw_latency = os.getenv('EL_OPTIMIZE_LATENCY', '3')
+    try:
+        optimize_latency = int(raw_latency)
+    except ValueError:
+        optimize_latency = None
+    if optimize_latency is None or not 0 <= optimize_latency <= 4:
+        print(f"Error: EL_OPTIMIZE_LATENCY must be an integer from 0 to 4, got '{raw_latency}'")
+        sys.exit(1)
+
+    output_format = os.getenv('EL_OUTPUT_FORMAT', 'ulaw_8000')
+    if output_format not in OUTPUT_AUDIO_FORMATS:
+        print(f"Error: EL_OUTPUT_FORMAT must be one of {', '.join(OUTPUT_AUDIO_FORMATS)}, got '{output_format}'")
+        sys.exit(1)
+
+    try:
+        system_prompt = _load_prompt()
+    except OSError as e:
+        print(f"Error: Could not read system prompt from {PROMPT_FILE}: {e.strerror}")
+        sys.exit(1)
+    if not system_prompt:
+        print(f"Error: System prompt file {PROMPT_FILE} is empty")
+        sys.exit(1)
+
     return {
         'api_key': api_key,
-        'vercel_url': vercel_url
+        'vercel_url': vercel_url,
+        'optimize_latency': optimize_latency,
+        'output_format': output_format,
+        'system_prompt': system_prompt
     }
 
-def create_webhook_tool(client, vercel_url):
-    """Create the Miami Theater Showtimes webhook tool."""
-
-    # Define the API schema for the webhook tool
-    api_schema = {
-        "url": f"{vercel_url}/api/showtimes",
-        "method": "GET",
-        "query_params_schema": {
-            "properties": {
-                "date": {
-                    "type": "string",
-                    "format": "date",
-                    "description": "Specific date in YYYY-MM-DD format (e.g., '2024-01-15')"
-                },
-                "movie_title": {
-                    "type": "string",
-                    "description": "Movie title to search for (partial matching supported, e.g., 'spider' for 'Spider-Man')"
-                },
-                "day_type": {
-                    "type": "string",
-                    "enum": ["today", "tomorrow", "weekend"],
-                    "description": "Quick date filters: 'today' for current day, 'tomorrow' for next day, 'weekend' for Friday-Sunday"
-                },
-                "time_preference": {
-                    "type": "string",
-                    "enum": ["afternoon", "evening", "night"],
-                    "description": "Filter by time of day: 'afternoon' (12-5 PM), 'evening' (5-9 PM), 'night' (9 PM+)"
-                }
-            }
-        },
+def build_api_schema(vercel_url):
+    """Build the webhook tool's api_schema for this deployment."""
+    # Fill in the deployment-specific parts of the shared template
+    return {
+        **API_SCHEMA_TEMPLATE,
+        "url": API_SCHEMA_TEMPLATE["url"].format(vercel_url=vercel_url),
         "request_headers": {
             "Content-Type": "application/json",
             "User-Agent": "ElevenLabs-Agent/1.0",
@@ -63,11 +217,52 @@ def create_webhook_tool(client, vercel_url):
         }
     }
 
+def build_agent_config(config):
+    """Build the agent payload; the tool id is filled in once the tool exists."""
+    return {
+        "name": "Miami Theater Voice Assistant",
+        "conversation_config": {
+            "agent": {
+                "prompt": {
+                    "prompt": config['system_prompt'],
+                    "tool_ids": [TOOL_ID_PLACEHOLDER]
+                },
+                "first_message": "Hi! I'm your Miami theater assistant. I can help you find movie showtimes at local theaters. What would you like to know about current movies and showtimes?"
+            },
+            # ulaw_8000 matches telephony audio, so Twilio calls skip resampling.
+            # optimize_streaming_latency is still sent for older agents, but
+            # current API versions (SDK 2.x) document it as a no-op and ignore it
+            "tts": {
+                "optimize_streaming_latency": config['optimize_latency'],
+                "agent_output_audio_format": config['output_format']
+            }
+        }
+    }
+
+def validate_configs(api_schema, agent_config):
+    """Validate both payloads locally, before any request reaches ElevenLabs."""
+    try:
+        _TOOL_VALIDATOR.validate(api_schema)
+    except jsonschema.ValidationError as e:
+        print(f"❌ Invalid webhook tool schema at {e.json_path}: {e.message}")
+        return False
+
+    try:
+        _AGENT_VALIDATOR.validate(agent_config)
+    except jsonschema.ValidationError as e:
+        print(f"❌ Invalid agent configuration at {e.json_path}: {e.message}")
+        return False
+
+    return True
+
+def create_webhook_tool(client, api_schema):
+    """Create the Miami Theater Showtimes webhook tool."""
+
     # Create the webhook tool
     webhook_config = WebhookRequestModel(
         name="Miami-Theater-Showtimes",
         description="Get current movie showtimes for Miami theaters. Can search by date, movie title, day type (today/tomorrow/weekend), or time preference (afternoon/evening/night).",
-        response_timeout_secs=10,
+        response_timeout_secs=5,
         api_schema=api_schema
     )
 
@@ -81,53 +276,8 @@ def create_webhook_tool(client, vercel_url):
         print(f"❌ Error creating webhook tool: {e}")
         return None
 
-def create_agent(client, tool_id):
+def create_agent(client, agent_config):
     """Create the conversational AI agent with the webhook tool."""
-
-    # Define the agent's system prompt
-    system_prompt = """You are a helpful Miami theater assistant specializing in movie showtimes.
-
-Your primary function is to help users find movie showtimes at Miami theaters using the Miami Theater Showtimes tool.
-
-Key capabilities:
-- Search by specific date (e.g., "What's playing on January 15th?")
-- Search by movie title (e.g., "When is Spider-Man playing?")
-- Quick day filters (today, tomorrow, weekend)
-- Time preferences (afternoon, evening, night shows)
-
-Guidelines:
-1. Always use the Miami Theater Showtimes tool to get current, accurate information
-2. If a user asks about showtimes, determine what type of search they want:
-   - Specific movie? Use movie_title parameter
-   - Specific date? Use date parameter (YYYY-MM-DD format)
-   - Today/tomorrow/weekend? Use day_type parameter
-   - Preference for time of day? Add time_preference parameter
-3. Present results in a natural, conversational way
-4. Include relevant details like theater location, rating, and special formats
-5. If no results found, suggest alternatives or ask for clarification
-
-Example interactions:
-- "What movies are playing tonight?" → Use day_type=today, time_preference=evening
-- "When is The Substance showing?" → Use movie_title=The Substance
-- "What's playing this weekend?" → Use day_type=weekend
-- "Any afternoon shows tomorrow?" → Use day_type=tomorrow, time_preference=afternoon
-
-Always be friendly, helpful, and provide clear information about Miami theater showtimes."""
-
-    # Create the agent configuration
-    agent_config = {
-        "name": "Miami Theater Voice Assistant",
-        "conversation_config": {
-            "agent": {
-                "prompt": {
-                    "prompt": system_prompt,
-                    "tool_ids": [tool_id] if tool_id else []
-                },
-                "first_message": "Hi! I'm your Miami theater assistant. I can help you find movie showtimes at local theaters. What would you like to know about current movies and showtimes?"
-            }
-        }
-    }
-
     try:
         agent = client.conversational_ai.agents.create(agent_config)
         print(f"✅ Created agent: {agent.agent_id}")
@@ -146,35 +296,49 @@ def main():
     print(f"🔑 Using API key: {config['api_key'][:8]}...")
     print(f"🌐 Vercel URL: {config['vercel_url']}")
 
-    # Initialize ElevenLabs client
-    client = ElevenLabs(api_key=config['api_key'])
+    # Validate both payloads up front so a bad config never leaves an orphaned tool
+    api_schema = build_api_schema(config['vercel_url'])
+    agent_config = build_agent_config(config)
+    if not validate_configs(api_schema, agent_config):
+        print("❌ Configuration is invalid. Exiting.")
+        sys.exit(1)
 
-    # Create webhook tool
-    print("\n📡 Creating webhook tool...")
-    tool_id = create_webhook_tool(client, config['vercel_url'])
+    # Initialize ElevenLabs client; tool and agent creation share one HTTP/2 connection
+    with httpx.Client(
+        http2=True,
+        follow_redirects=True,
+        timeout=REQUEST_TIMEOUT,
+        limits=CONNECTION_LIMITS
+    ) as http_client:
+        client = ElevenLabs(api_key=config['api_key'], httpx_client=http_client)
 
-    if not tool_id:
-        print("❌ Failed to create webhook tool. Exiting.")
-        sys.exit(1)
+        # Create webhook tool
+        print("\n📡 Creating webhook tool...")
+        tool_id = create_webhook_tool(client, api_schema)
 
-    # Create agent
-    print("\n🤖 Creating conversational agent...")
-    agent_id = create_agent(client, tool_id)
+        if not tool_id:
+            print("❌ Failed to create webhook tool. Exiting.")
+            sys.exit(1)
 
-    if not agent_id:
-        print("❌ Failed to create agent. Exiting.")
-        sys.exit(1)
+        # Create agent
+        print("\n🤖 Creating conversational agent...")
+        agent_config["conversation_config"]["agent"]["prompt"]["tool_ids"] = [tool_id]
+        agent_id = create_agent(client, agent_config)
+
+        if not agent_id:
+            print("❌ Failed to create agent. Exiting.")
+            sys.exit(1)
 
     # Save configuration
     setup_config = {
         "tool_id": tool_id,
         "agent_id": agent_id,
         "vercel_url": config['vercel_url'],
-        "created_at": "2024-01-15T10:00:00Z"  # You can use actual timestamp
+        "created_at": datetime.now(timezone.utc).isoformat()
     }
 
-    with open('agent_config.json', 'w') as f:
-        json.dump(setup_config, f, indent=2)
+    with open('agent_config.json', 'wb') as f:
+        f.write(orjson.dumps(setup_config, option=orjson.OPT_INDENT_2))
 
     print(f"\n✅ Setup complete!")
     print(f"🆔 Tool ID: {tool_id}")
@@ -6,12 +6,121 @@ Tests the webhook tool functionality and API responses.
 
 import os
 import json
-import requests
+import asyncio
+import httpx
+import ijson
 from datetime import datetime
 
-def test_api_endpoint(base_url):
+REQUEST_TIMEOUT = httpx.Timeout(10.0)
+CONNECTION_LIMITS = httpx.Limits(max_keepalive_connections=4)
+
+# Per-query ETags and results from earlier runs, used for conditional GETs
+CACHE_FILE = '.showtimes_cache.json'
+
+def load_response_cache():
+    """Load cached showtimes results keyed by their query parameters."""
+    if not os.path.exists(CACHE_FILE):
+        return {}
+
+    try:
+        with open(CACHE_FILE, 'r') as f:
+            entries = json.load(f)
+
+        return {
+            frozenset(entry['params'].items()): (entry['etag'], entry['body'])
+            for entry in entries
+        }
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        # Unreadable or wrongly shaped cache; start fresh
+        return {}
+
+def save_response_cache(cache):
+    """Persist cached showtimes results for the next run."""
+    entries = [
+        {"params": dict(key), "etag": etag, "body": body}
+        for key, (etag, body) in cache.items()
+    ]
+    with open(CACHE_FILE, 'w') as f:
+        json.dump(entries, f, indent=2)
+
+class _ResponseReader:
+    """Expose an httpx response body as the async file object ijson reads."""
+
+    def __init__(self, response):
+        self._chunks = response.aiter_bytes()
+        self._buffer = b''
+
+    async def read(self, size=-1):
+        # ijson probes with read(0) to detect bytes, so honour the size
+        while not self._buffer and size != 0:
+            try:
+                self._buffer = await self._chunks.__anext__()
+            except StopAsyncIteration:
+                break
+
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+async def _read_summary(response):
+    """Stream the response body, keeping only the fields the test reports."""
+    body = {"results_count": 0, "conversational_summary": None}
+
+    # The showtimes array is parsed event by event and never materialized
+    async for prefix, event, value in ijson.parse_async(_ResponseReader(response)):
+        if prefix == 'query_info.results_count':
+            body["results_count"] = value
+        elif prefix == 'conversational_summary' and event == 'string':
+            body["conversational_summary"] = value
+
+    return body
+
+async def _run_api_case(client, base_url, i, params, cache):
+    """Run a single showtimes query and return its report lines."""
+    lines = [f"  Test {i}: {params}"]
+    key = frozenset(params.items())
+    cached = cache.get(key) if cache is not None else None
+    headers = {'If-None-Match': cached[0]} if cached else {}
+
+    try:
+        async with client.stream("GET", f"{base_url}/api/showtimes", params=params, headers=headers) as response:
+            if response.status_code == 304 and cached:
+                body = cached[1]
+                status = f"{response.status_code} (not modified, using cached result)"
+            else:
+                body = await _read_summary(response)
+                status = response.status_code
+
+                etag = response.headers.get('ETag')
+                if cache is not None and etag and response.status_code == 200:
+                    cache[key] = (etag, body)
+
+        lines.append(f"    Status: {status}")
+        lines.append(f"    Results: {body['results_count']} showtimes")
+
+        # Check for conversational summary
+        if body['conversational_summary']:
+            summary = body['conversational_summary'][:100] + "..." if len(body['conversational_summary']) > 100 else body['conversational_summary']
+            lines.append(f"    Summary: {summary}")
+
+    except Exception as e:
+        lines.append(f"    ❌ Error: {e}")
+
+    lines.append("")
+    return lines
+
+async def _supports_etag(client, base_url):
+    """Probe the endpoint with HEAD to see whether it issues ETags."""
+    try:
+        response = await client.head(f"{base_url}/api/showtimes")
+    except httpx.HTTPError:
+        return False
+    return response.status_code < 400 and 'ETag' in response.headers
+
+async def test_api_endpoint(client, base_url):
     """Test the API endpoint directly."""
-    print("🧪 Testing API endpoint directly...")
+    lines = ["🧪 Testing API endpoint directly..."]
 
     # Test different query types
     test_cases = [
@@ -22,79 +131,60 @@ def test_api_endpoint(base_url):
         {"time_preference": "evening", "day_type": "today"}
     ]
 
-    for i, params in enumerate(test_cases, 1):
-        try:
-            response = requests.get(f"{base_url}/api/showtimes", params=params)
-            data = response.json()
-
-            print(f"  Test {i}: {params}")
-            print(f"    Status: {response.status_code}")
-            print(f"    Results: {data.get('query_info', {}).get('results_count', 0)} showtimes")
+    # Only send conditional requests when the deployment returns ETags
+    cache = load_response_cache() if await _supports_etag(client, base_url) else None
 
-            # Check for conversational summary
-            if 'conversational_summary' in data:
-                summary = data['conversational_summary'][:100] + "..." if len(data['conversational_summary']) > 100 else data['conversational_summary']
-                print(f"    Summary: {summary}")
+    results = await asyncio.gather(*(
+        _run_api_case(client, base_url, i, params, cache)
+        for i, params in enumerate(test_cases, 1)
+    ))
+    for case_lines in results:
+        lines.extend(case_lines)
 
-            print()
+    if cache:
+        save_response_cache(cache)
 
-        except Exception as e:
-            print(f"    ❌ Error: {e}")
-            print()
+    return lines
 
-def test_elevenlabs_tool(tool_id, api_key):
+async def test_elevenlabs_tool(client, tool_id):
     """Test the ElevenLabs tool configuration."""
-    print("🤖 Testing ElevenLabs tool...")
-
-    headers = {
-        'xi-api-key': api_key,
-        'Content-Type': 'application/json'
-    }
+    lines = ["🤖 Testing ElevenLabs tool..."]
 
     try:
         # Get tool information
-        response = requests.get(
-            f'https://api.elevenlabs.io/v1/convai/tools/{tool_id}',
-            headers=headers
-        )
+        response = await client.get(f'/v1/convai/tools/{tool_id}')
 
         if response.status_code == 200:
             tool_data = response.json()
-            print(f"  ✅ Tool found: {tool_data.get('name', 'Unknown')}")
-            print(f"  Description: {tool_data.get('description', 'No description')}")
+            lines.append(f"  ✅ Tool found: {tool_data.get('name', 'Unknown')}")
+            lines.append(f"  Description: {tool_data.get('description', 'No description')}")
 
             # Check API schema
             api_schema = tool_data.get('tool_config', {}).get('api_schema', {})
             if api_schema:
-                print(f"  URL: {api_schema.get('url', 'Not set')}")
-                print(f"  Method: {api_schema.get('method', 'Not set')}")
+                lines.append(f"  URL: {api_schema.get('url', 'Not set')}")
+                lines.append(f"  Method: {api_schema.get('method', 'Not set')}")
 
         else:
-            print(f"  ❌ Tool not found. Status: {response.status_code}")
-            print(f"  Response: {response.text}")
+            lines.append(f"  ❌ Tool not found. Status: {response.status_code}")
+            lines.append(f"  Response: {response.text}")
 
     except Exception as e:
-        print(f"  ❌ Error testing tool: {e}")
+        lines.append(f"  ❌ Error testing tool: {e}")
 
-def test_agent_configuration(agent_id, api_key):
-    """Test the ElevenLabs agent configuration."""
-    print("👤 Testing ElevenLabs agent...")
+    return lines
 
-    headers = {
-        'xi-api-key': api_key,
-        'Content-Type': 'application/json'
-    }
+async def test_agent_configuration(client, agent_id):
+    """Test the ElevenLabs agent configuration."""
+    lines = ["👤 Testing ElevenLabs agent..."]
 
     try:
         # Get agent information
-        response = requests.get(
-            f'https://api.elevenlabs.io/v1/convai/agents/{agent_id}',
-            headers=headers
-        )
+        response = await client.get(f'/v1/convai/agents/{agent_id}')
 
         if response.status_code == 200:
             agent_data = response.json()
-            print(f"  ✅ Agent found: {agent_data.get('name', 'Unknown')}")
+            lines.append(f"  ✅ Agent found: {agent_data.get('name', 'Unknown')}")
 
             # Check tools
             conversation_config = agent_data.get('conversation_config', {})
@@ -102,19 +192,44 @@ def test_agent_configuration(agent_id, api_key):
             prompt_config = agent_config.get('prompt', {})
             tools = prompt_config.get('tools', [])
 
-            print(f"  Tools configured: {len(tools)}")
+            lines.append(f"  Tools configured: {len(tools)}")
             for tool in tools:
                 if isinstance(tool, str):
-                    print(f"    - Tool ID: {tool}")
+                    lines.append(f"    - Tool ID: {tool}")
                 else:
-                    print(f"    - Tool: {tool}")
+                    lines.append(f"    - Tool: {tool}")
 
         else:
-            print(f"  ❌ Agent not found. Status: {response.status_code}")
-            print(f"  Response: {response.text}")
+            lines.append(f"  ❌ Agent not found. Status: {response.status_code}")
+            lines.append(f"  Response: {response.text}")
 
     except Exception as e:
-        print(f"  ❌ Error testing agent: {e}")
+        lines.append(f"  ❌ Error testing agent: {e}")
+
+    return lines
+
+async def _run_all(base_url, tool_id, agent_id, api_key):
+    """Run all test phases concurrently over pooled HTTP/2 clients."""
+    # One HTTP/2 connection to api.elevenlabs.io carries both the tool and
+    # agent lookups as parallel streams, so only one TLS handshake is paid
+    elevenlabs_client = httpx.AsyncClient(
+        http2=True,
+        base_url='https://api.elevenlabs.io',
+        headers={'xi-api-key': api_key},
+        timeout=REQUEST_TIMEOUT,
+        limits=CONNECTION_LIMITS
+    )
+    api_client = httpx.AsyncClient(http2=True, timeout=REQUEST_TIMEOUT, limits=CONNECTION_LIMITS)
+
+    try:
+        return await asyncio.gather(
+            test_api_endpoint(api_client, base_url),
+            test_elevenlabs_tool(elevenlabs_client, tool_id),
+            test_agent_configuration(elevenlabs_client, agent_id)
+        )
+    finally:
+        await elevenlabs_client.aclose()
+        await api_client.aclose()
 
 def main():
     """Main test function."""
@@ -147,10 +262,9 @@ def main():
     print(f"  Agent ID: {agent_id}")
     print()
 
-    # Run tests
-    test_api_endpoint(base_url)
-    test_elevenlabs_tool(tool_id, api_key)
-    test_agent_configuration(agent_id, api_key)
+    # Run tests; phases report back so their output is not interleaved
+    for phase_lines in asyncio.run(_run_all(base_url, tool_id, agent_id, api_key)):
+        print("\n".join(phase_lines))
 
     print("🏁 Testing complete!")
     print("\n📱 Next steps:")
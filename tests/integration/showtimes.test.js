@@ -2,6 +2,16 @@ import { describe, test, expect, beforeEach, jest, afterEach } from '@jest/globa
 import { createMocks } from 'node-mocks-http';
 import { getMockShowtimesData } from '../mocks/mockData.js';
 
+// Serve fixed showtimes from a mocked Redis so last_updated is stable
+function mockRedisShowtimes(lastUpdated) {
+  const showtimes = getMockShowtimesData();
+  jest.unstable_mockModule('@upstash/redis', () => ({
+    Redis: jest.fn(() => ({
+      get: jest.fn(async (key) => (key === 'showtimes:current' ? showtimes : lastUpdated))
+    }))
+  }));
+}
+
 // Simple functional test approach
 describe('/api/showtimes (simple)', () => {
   let originalEnv;
@@ -51,6 +61,27 @@ describe('/api/showtimes (simple)', () => {
     expect(res._getHeaders()['access-control-allow-headers']).toBe('Content-Type, Authorization');
   });
 
+  test('sets an ETag header on GET responses', async () => {
+    const handler = (await import('../../api/showtimes.js')).default;
+    const { req, res } = createMocks({ method: 'GET' });
+
+    await handler(req, res);
+
+    expect(res._getStatusCode()).toBe(200);
+    expect(res._getHeaders().etag).toMatch(/^W\/"[0-9a-f]{40}"$/);
+  });
+
+  test('answers HEAD requests with headers only', async () => {
+    const handler = (await import('../../api/showtimes.js')).default;
+    const { req, res } = createMocks({ method: 'HEAD' });
+
+    await handler(req, res);
+
+    expect(res._getStatusCode()).toBe(200);
+    expect(res._getHeaders().etag).toBeDefined();
+    expect(res._getData()).toBe('');
+  });
+
   test('handles date query parameter', async () => {
     const handler = (await import('../../api/showtimes.js')).default;
     const today = new Date().toISOString().split('T')[0];
@@ -106,4 +137,65 @@ describe('/api/showtimes (simple)', () => {
       expect(typeof showtime.summary).toBe('string');
     }
   });
-});
\ No newline at end of file
+});
+
+// ETag revalidation against fixed Redis data; kept last so the module mock
+// doesn't leak into the development-fallback tests above
+describe('/api/showtimes ETag revalidation', () => {
+  let originalEnv;
+
+  beforeEach(() => {
+    originalEnv = { ...process.env };
+    process.env.VERCEL_ENV = 'development';
+    process.env.KV_REST_API_URL = 'https://test-redis.upstash.io';
+    process.env.KV_REST_API_TOKEN = 'test-token';
+  });
+
+  afterEach(() => {
+    process.env = originalEnv;
+    jest.resetModules();
+  });
+
+  test('returns 304 when If-None-Match matches the current ETag', async () => {
+    mockRedisShowtimes('2024-01-15T10:00:00.000Z');
+    const handler = (await import('../../api/showtimes.js?t=' + Date.now())).default;
+    const first = createMocks({ method: 'GET', query: { day_type: 'weekend' } });
+
+    await handler(first.req, first.res);
+    const etag = first.res._getHeaders().etag;
+
+    const { req, res } = createMocks({
+      method: 'GET',
+      query: { day_type: 'weekend' },
+      headers: { 'if-none-match': etag }
+    });
+
+    await handler(req, res);
+
+    expect(res._getStatusCode()).toBe(304);
+    expect(res._getHeaders().etag).toBe(etag);
+    expect(res._getData()).toBe('');
+  });
+
+  test('changes the ETag when last_updated changes', async () => {
+    mockRedisShowtimes('2024-01-15T10:00:00.000Z');
+    const handler = (await import('../../api/showtimes.js?t=' + Date.now())).default;
+    const first = createMocks({ method: 'GET', query: { day_type: 'weekend' } });
+    await handler(first.req, first.res);
+
+    jest.resetModules();
+    mockRedisShowtimes('2024-01-15T10:30:00.000Z');
+    const updatedHandler = (await import('../../api/showtimes.js?t=' + Date.now())).default;
+    const { req, res } = createMocks({
+      method: 'GET',
+      query: { day_type: 'weekend' },
+      headers: { 'if-none-match': first.res._getHeaders().etag }
+    });
+
+    await updatedHandler(req, res);
+
+    expect(res._getStatusCode()).toBe(200);
+    expect(res._getHeaders().etag).not.toBe(first.res._getHeaders().etag);
+    expect(JSON.parse(res._getData()).last_updated).toBe('2024-01-15T10:30:00.000Z');
+  });
+});